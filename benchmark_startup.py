@@ -0,0 +1,68 @@
+"""
+DESCRIPTION:
+- The script to check the import-time budget of the package.
+- The script imports source.graph in fresh interpreters and measures the
+cumulative import time reported by python -X importtime.
+- The heavy dependencies (tqdm, sympy, quine_mccluskey) and the symbolic
+backend should only be loaded when the corresponding feature is used, so
+none of them should be present after the import.
+- The script exits with an error if the budget is exceeded.
+Author: Mario Rubio.
+"""
+
+# Libraries
+import sys
+import subprocess
+
+
+# Functions
+def measure_import(module, repeats):
+    """
+    DESCRIPTION:
+    Function to measure the import time of a module in fresh interpreters.
+    :param module: [str] the module to import.
+    :param repeats: [int] number of interpreters to launch.
+    :return: [float] the minimum cumulative import time in seconds.
+    """
+    times = []
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, check=True)
+        # The last line is the module itself: self [us] | cumulative [us] | name
+        times.append(int(result.stderr.strip().splitlines()[-1].split("|")[1]) / 1e6)
+    return min(times)
+
+def loaded_heavy_modules(module):
+    """
+    DESCRIPTION:
+    Function to obtain the heavy modules loaded by the import of a module.
+    :param module: [str] the module to import.
+    :return: [list] the heavy modules (str) present after the import.
+    """
+    code = (f"import sys, {module}; "
+        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+def main():
+    """
+    DESCRIPTION:
+    Function main to execute the benchmark.
+    """
+    import_time = measure_import(MODULE, REPEATS)
+    heavy_modules = loaded_heavy_modules(MODULE)
+    print(f"Import time of {MODULE}: {import_time * 1000:.1f} ms (budget: {BUDGET * 1000:.0f} ms)")
+    print(f"Heavy modules loaded at import: {heavy_modules}")
+    if import_time > BUDGET or heavy_modules:
+        sys.exit("Import-time budget exceeded")
+    print("Import-time budget met")
+
+
+# Parameters
+MODULE = "source.graph"
+HEAVY_MODULES = ("tqdm", "sympy", "quine_mccluskey", "source.bdd_utils")
+# Budget of the cumulative import time in seconds
+BUDGET = 0.1
+REPEATS = 5
+if __name__ == "__main__":
+    main()
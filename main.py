@@ -6,11 +6,15 @@ DESCRIPTION:
 - The script executes the pipeline over the graph stored in the data.json.
 - The file data.json should store the graph and all the data related to the
 inference problem.
+- Optionally, the script runs only the shard i of n of the pathway groups:
+python main.py <i> <n>. The outputs of the shards are merged with 
+merge_shards.py.
 Author: Mario Rubio.
 """
 
 # Libraries
 import os
+import sys
 import json
 from source.graph import Graph
 
@@ -24,19 +28,25 @@ def main():
     DESCRIPTION:
     Function main to execute the code.
     """
+    # Read the shard to run, if any
+    shard = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) == 3 else None
     # Read input data
     with open("input_data_mtor.json", "r") as file:
         input_data = json.load(file)
     # Create graph object
     graph = Graph(**input_data)
     # Create pathways
-    graph.obtain_pathways_from_graph()
+    graph.obtain_pathways_from_graph(shard=shard)
     # Generate NCBFs from pathways
     graph.generate_NCBFs()
     # Filter based on the attractors
     graph.prefilter()
     # Save
-    graph.print_networks_to_folder()
+    if shard is None:
+        graph.print_networks_to_folder()
+    else:
+        os.makedirs(graph.networks_path, exist_ok=True)
+        graph.save_networks_to_json(graph.networks_path + f"/shard_{shard[0]}_of_{shard[1]}.json")
     # Print result
     print("Process completed")
     print(graph)
@@ -0,0 +1,37 @@
+"""
+DESCRIPTION:
+- The script to merge the outputs of the shards of a run.
+- Every shard is a json file written by Graph.save_networks_to_json.
+- The script removes the equivalent networks across shards, and writes the
+merged networks into a json file and into a folder in boolnet format.
+- Usage: python merge_shards.py <output_folder> <shard_1.json> <shard_2.json> ...
+Author: Mario Rubio.
+"""
+
+# Libraries
+import sys
+import json
+from source.data_utils import merge_shards, print_merged_networks_to_folder
+
+
+# Functions
+def main():
+    """
+    DESCRIPTION:
+    Function main to execute the code.
+    """
+    folder_path, shard_paths = sys.argv[1], sys.argv[2:]
+    # Merge the shards
+    merged = merge_shards(shard_paths)
+    # Save
+    print_merged_networks_to_folder(merged, folder_path)
+    with open(folder_path + "/merged.json", "w") as file:
+        json.dump(merged, file)
+    # Print result
+    print("Process completed")
+    print(f"Total networks after merging: {len(merged['networks'])}")
+
+
+# Parameters
+if __name__ == "__main__":
+    main()
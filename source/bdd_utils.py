@@ -0,0 +1,260 @@
+"""
+DESCRIPTION:
+- A small manager of reduced ordered binary decision diagrams (BDDs).
+- The BDD functions behave like the frozensets of minterms used in the
+explicit backend, so the same algebra works with both representations.
+Author: Mario Rubio.
+"""
+
+# Classes
+class BDDManager:
+    """
+    DESCRIPTION:
+    The manager that stores all the BDD nodes of a space of variables. Every
+    node is an integer: 0 and 1 are the terminals, and the rest point to
+    their variable and their low and high children. The unique table
+    guarantees that there is only one node per function, so two functions
+    are equal if and only if their nodes are equal.
+    """
+
+    # Methods
+    def __init__(self, n_variables):
+        """
+        DESCRIPTION:
+        Constructor of the class.
+        :param n_variables: [int] number of variables of the space. The
+        variable i is the position i in the minterm strings.
+        """
+        self.n_variables = n_variables
+        # Node tables. The terminals are placed below all the variables.
+        self.variables = [n_variables, n_variables]
+        self.lows = [0, 1]
+        self.highs = [0, 1]
+        self.unique_table = {}
+        # Operation caches
+        self.apply_cache = {}
+        self.not_cache = {}
+        self.count_cache = {}
+        self.false = BDDFunction(self, 0)
+        self.true = BDDFunction(self, 1)
+
+    def __len__(self):
+        """
+        DESCRIPTION:
+        Method to obtain the number of nodes stored in the manager.
+        :return: [int] number of nodes, terminals included.
+        """
+        return len(self.variables)
+
+    def make_node(self, variable, low, high):
+        """
+        DESCRIPTION:
+        Method to obtain the node of a variable with the given children,
+        applying the reduction rules.
+        :param variable: [int] the variable of the node.
+        :param low: [int] node when the variable is 0.
+        :param high: [int] node when the variable is 1.
+        :return: [int] the node.
+        """
+        if low == high:
+            return low
+        key = (variable, low, high)
+        if key not in self.unique_table:
+            self.unique_table[key] = len(self.variables)
+            self.variables.append(variable)
+            self.lows.append(low)
+            self.highs.append(high)
+        return self.unique_table[key]
+
+    def literal(self, variable, value):
+        """
+        DESCRIPTION:
+        Method to obtain the function of a single variable with a value.
+        :param variable: [int] the variable of the literal.
+        :param value: [int] 1 for the variable and 0 for its negation.
+        :return: [BDDFunction] the literal.
+        """
+        node = self.make_node(variable, 0, 1) if int(value) else self.make_node(variable, 1, 0)
+        return BDDFunction(self, node)
+
+    def from_cubes(self, cubes):
+        """
+        DESCRIPTION:
+        Method to obtain the function that is the union of some cubes.
+        :param cubes: [list] cubes (str) with '*' in the free variables.
+        :return: [BDDFunction] the function.
+        """
+        function = self.false
+        for cube in cubes:
+            term = self.true
+            for variable in range(len(cube)):
+                if cube[variable] != '*':
+                    term = term & self.literal(variable, cube[variable])
+            function = function | term
+        return function
+
+    def apply(self, operation, u, v):
+        """
+        DESCRIPTION:
+        Method to compute the conjunction or the disjunction of two nodes.
+        :param operation: [str] 'and' or 'or'.
+        :param u: [int] first node.
+        :param v: [int] second node.
+        :return: [int] the resulting node.
+        """
+        # Terminal cases
+        if u == v:
+            return u
+        if operation == 'and':
+            if u == 0 or v == 0:
+                return 0
+            if u == 1:
+                return v
+            if v == 1:
+                return u
+        else:
+            if u == 1 or v == 1:
+                return 1
+            if u == 0:
+                return v
+            if v == 0:
+                return u
+        # Both operations are commutative
+        key = (operation, u, v) if u < v else (operation, v, u)
+        if key not in self.apply_cache:
+            variable = min(self.variables[u], self.variables[v])
+            u_low, u_high = (self.lows[u], self.highs[u]) if self.variables[u] == variable else (u, u)
+            v_low, v_high = (self.lows[v], self.highs[v]) if self.variables[v] == variable else (v, v)
+            self.apply_cache[key] = self.make_node(
+                variable,
+                self.apply(operation, u_low, v_low),
+                self.apply(operation, u_high, v_high)
+            )
+        return self.apply_cache[key]
+
+    def negate(self, u):
+        """
+        DESCRIPTION:
+        Method to compute the negation of a node.
+        :param u: [int] the node.
+        :return: [int] the resulting node.
+        """
+        if u < 2:
+            return 1 - u
+        if u not in self.not_cache:
+            self.not_cache[u] = self.make_node(
+                self.variables[u], self.negate(self.lows[u]), self.negate(self.highs[u])
+                )
+        return self.not_cache[u]
+
+    def evaluate(self, u, term):
+        """
+        DESCRIPTION:
+        Method to evaluate a node in a minterm.
+        :param u: [int] the node.
+        :param term: [str] the minterm, one digit per variable.
+        :return: [bool] the value of the function in the minterm.
+        """
+        while u > 1:
+            u = self.highs[u] if term[self.variables[u]] == '1' else self.lows[u]
+        return bool(u)
+
+    def count(self, u):
+        """
+        DESCRIPTION:
+        Method to count the minterms of a node without enumerating them.
+        :param u: [int] the node.
+        :return: [int] number of minterms in which the function is 1.
+        """
+        def below(u):
+            # Number of minterms over the variables from the one of u onwards
+            if u < 2:
+                return u
+            if u not in self.count_cache:
+                variable = self.variables[u]
+                low, high = self.lows[u], self.highs[u]
+                self.count_cache[u] = (below(low) * 2 ** (self.variables[low] - variable - 1)
+                    + below(high) * 2 ** (self.variables[high] - variable - 1))
+            return self.count_cache[u]
+
+        return below(u) * 2 ** self.variables[u]
+
+    def cubes(self, u):
+        """
+        DESCRIPTION:
+        A generator of the paths from a node to the terminal 1. Every path
+        is a cube, and all of them form a disjoint cover of the function.
+        :param u: [int] the node.
+        :return: [str] the cube with '*' in the variables out of the path.
+        """
+        stack = [(u, ['*'] * self.n_variables)]
+        while stack:
+            u, cube = stack.pop()
+            if u == 1:
+                yield ''.join(cube)
+            elif u > 1:
+                variable = self.variables[u]
+                high_cube = list(cube)
+                high_cube[variable] = '1'
+                cube[variable] = '0'
+                stack.append((self.highs[u], high_cube))
+                stack.append((self.lows[u], cube))
+
+
+class BDDFunction:
+    """
+    DESCRIPTION:
+    A boolean function stored as a node of a BDDManager. It supports the
+    operations of the frozensets of minterms used in the explicit backend:
+    intersection (&), union (|), difference (-), membership of a minterm
+    (in), size (len) and emptiness (bool).
+    """
+
+    # Methods
+    def __init__(self, manager, node):
+        """
+        DESCRIPTION:
+        Constructor of the class.
+        :param manager: [BDDManager] the manager that stores the node.
+        :param node: [int] the node of the function.
+        """
+        self.manager = manager
+        self.node = node
+
+    def __and__(self, other):
+        return BDDFunction(self.manager, self.manager.apply('and', self.node, other.node))
+
+    def __or__(self, other):
+        return BDDFunction(self.manager, self.manager.apply('or', self.node, other.node))
+
+    def __invert__(self):
+        return BDDFunction(self.manager, self.manager.negate(self.node))
+
+    def __sub__(self, other):
+        return self & ~other
+
+    def __contains__(self, term):
+        return self.manager.evaluate(self.node, term)
+
+    def __len__(self):
+        return self.manager.count(self.node)
+
+    def __bool__(self):
+        return self.node != 0
+
+    def __eq__(self, other):
+        return isinstance(other, BDDFunction) and self.manager is other.manager and self.node == other.node
+
+    def __hash__(self):
+        return hash(self.node)
+
+    def __repr__(self):
+        return f'BDDFunction({self.node})'
+
+    def cubes(self):
+        """
+        DESCRIPTION:
+        Method to obtain the paths of the function to the terminal 1.
+        :return: [list] cubes (str) of the function.
+        """
+        return list(self.manager.cubes(self.node))
@@ -4,8 +4,6 @@
 import itertools
 from random import choice, sample
 from string import ascii_uppercase, digits
-from sympy import SOPform
-from quine_mccluskey.qm import QuineMcCluskey
 # from pyboolnet.Attractors import compute_attractors_tarjan
 # from pyboolnet.FileExchange import bnet2primes
 # from pyboolnet.StateTransitionGraphs import primes2stg
@@ -73,9 +71,12 @@ def minterms2bnet(variables, minterms):
     A function to obtain the function expression from the minterms in boolnet format.
     It is supposed that all the nodes are in alphabetical order. Important, this 
     function only returns the SOP without the name of the function, what is at the 
-    left side of the comma.
+    left side of the comma. When the function is a BDD, the cover is taken 
+    from its paths instead of simplifying the minterms, so no minterm is 
+    enumerated.
     :param nodes: [tuple] the function variables.
-    :param minterms: [frozenset] the minterms to build the expression.
+    :param minterms: [frozenset/BDDFunction] the minterms to build the 
+    expression.
     :return: [str] the function expression in boolnet format.
     """
     # When the function is always false
@@ -85,9 +86,16 @@ def minterms2bnet(variables, minterms):
     if len(minterms) == 2 ** len(variables):
         return '1'
     # Generañ case
-    qm = QuineMcCluskey(use_xor=False)
-    simplified_minterms = qm.simplify([int(term, 2) for term in minterms])
-    simplified_expression = [left_zfill(minterm.replace('-', '*'), len(variables)) for minterm in simplified_minterms]
+    if not isinstance(minterms, (set, frozenset)):
+        # BDDFunction of the symbolic backend
+        simplified_expression = minterms.cubes()
+    else:
+        # NOTE: the simplification is only loaded when it is used.
+        from quine_mccluskey.qm import QuineMcCluskey
+        qm = QuineMcCluskey(use_xor=False)
+        # NOTE: sorted so that the expression is the same in every process.
+        simplified_minterms = sorted(qm.simplify([int(term, 2) for term in minterms]))
+        simplified_expression = [left_zfill(minterm.replace('-', '*'), len(variables)) for minterm in simplified_minterms]
     # Pass the expression to boolnet format
     n_variables = range(len(variables))
     bnet_expression = ' | '.join([
@@ -234,4 +242,174 @@ def prefilter_by_attractor(networks, attractors):
                     for node_index in range(len(nodes))]
                 attractor_conditions.append(all(node_conditions))
             if all(attractor_conditions):
-                yield network
\ No newline at end of file
+                yield network
+
+def prefilter_node_by_attractor(node_index, domains, attractors):
+    """
+    DESCRIPTION:
+    A generator to filter the boolean functions of a single node based on
+    if they agree with certain attractors or not. A network holds an
+    attractor only if every node function agrees with it, so a network made
+    exclusively of functions that pass this filter passes 
+    prefilter_by_attractor.
+    :param node_index: [int] position of the node in the attractors.
+    :param domains: [list] boolean functions (set of minterms) of the node.
+    :param attractors: [list] attractors (str) to filter the functions.
+    :return: [frozenset] function that agrees with all the attractors.
+    """
+    for domain in domains:
+        if all((attractor in domain) == bool(int(attractor[node_index]))
+            for attractor in attractors):
+            yield domain
+
+
+def positions2mask(positions, n_bits):
+    """
+    DESCRIPTION:
+    A function to build, in a single pass, an integer with the bits in the 
+    given positions set to 1.
+    :param positions: [list] positions (int) of the bits set to 1.
+    :param n_bits: [int] the number of bits of the integer.
+    :return: [int] the mask.
+    """
+    bits = bytearray((n_bits + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, 'little')
+
+def mask2bits(mask, n_bits):
+    """
+    DESCRIPTION:
+    A function to unpack an integer, in a single pass, into a string in
+    which the character k is the bit k.
+    :param mask: [int] the mask.
+    :param n_bits: [int] the number of bits of the mask.
+    :return: [str] the bits ('0' or '1') in order of position.
+    """
+    return format(mask, f'0{n_bits}b')[::-1] if n_bits else ''
+
+def function_masks(networks, node):
+    """
+    DESCRIPTION:
+    A function to group the networks by the function of a node. Every
+    distinct function is then evaluated once for all the networks using it.
+    :param networks: [list] boolean networks (dict).
+    :param node: [str] the node whose functions are grouped.
+    :return: [list] pairs of a distinct function and the mask (int) of the
+    networks using it, the bit k for the network k.
+    """
+    positions = {}
+    for k in range(len(networks)):
+        positions.setdefault(networks[k][node], []).append(k)
+    return [(function, positions2mask(function_positions, len(networks)))
+        for function, function_positions in positions.items()]
+
+def agreement_mask(masks, term, value):
+    """
+    DESCRIPTION:
+    A function to evaluate the function of a node in a term for all the 
+    networks at once. The result is an integer with one bit per network.
+    :param masks: [list] the distinct functions of the node and the masks of
+    the networks using them, as returned by function_masks.
+    :param term: [str] the term where the function is evaluated.
+    :param value: [bool] the expected value of the function.
+    :return: [int] the bit k is 1 if the function of the network k takes
+    the expected value in the term.
+    """
+    mask = 0
+    for function, networks_mask in masks:
+        if (term in function) == value:
+            mask |= networks_mask
+    return mask
+
+def screen_perturbations(networks, nodes, attractors):
+    """
+    DESCRIPTION:
+    A function to check, for all the networks and all the single-node
+    knockouts (function clamped to 0) and overexpressions (clamped to 1) at
+    once, if the attractors remain steady states of the perturbed network.
+    A perturbation of the node i to the value v moves the attractor to the
+    state with the node i set to v, which is a steady state if the rest of
+    nodes keep their values in it. The check is bit-parallel: for every
+    state and node, an integer stores one bit per network telling if the
+    node function agrees with the state. When v is the value of the node in
+    the attractor, the state is the attractor itself, and the conjunctions
+    of the rest of nodes come from prefix and suffix conjunctions.
+    :param networks: [list] boolean networks (dict) to screen.
+    :param nodes: [tuple] the nodes in the order of the attractors.
+    :param attractors: [list] attractors (str) that should be preserved.
+    :return: [tuple] the perturbations, (node, clamped value), and the
+    result matrix, one row per network and one column per perturbation, True
+    if all the attractors are preserved.
+    """
+    perturbations = [(node, value) for node in nodes for value in (0, 1)]
+    n_networks = len(networks)
+    full = (1 << n_networks) - 1
+    preserved = [full] * len(perturbations)
+    node_masks = [function_masks(networks, node) for node in nodes]
+    for attractor in attractors:
+        # Bit k of agreement[i]: the node i of the network k agrees with the attractor
+        agreement = [agreement_mask(node_masks[i], attractor, attractor[i] == '1')
+            for i in range(len(nodes))]
+        prefix = [full]
+        for i in range(len(nodes)):
+            prefix.append(prefix[-1] & agreement[i])
+        suffix = [full]
+        for i in reversed(range(len(nodes))):
+            suffix.append(suffix[-1] & agreement[i])
+        suffix.reverse()
+        for i in range(len(nodes)):
+            value = int(attractor[i])
+            # The clamped value holds the attractor: conjunction of the rest of nodes
+            preserved[2 * i + value] &= prefix[i] & suffix[i + 1]
+            # The opposite value moves the attractor to a perturbed state
+            perturbed = attractor[:i] + str(1 - value) + attractor[i + 1:]
+            mask = preserved[2 * i + 1 - value]
+            for j in range(len(nodes)):
+                if not mask:
+                    break
+                if j != i:
+                    mask &= agreement_mask(node_masks[j], perturbed, perturbed[j] == '1')
+            preserved[2 * i + 1 - value] = mask
+    # Unpack every column once
+    columns = [mask2bits(mask, n_networks) for mask in preserved]
+    matrix = [[column[k] == '1' for column in columns] for k in range(n_networks)]
+    return perturbations, matrix
+
+
+def score_transitions(networks, nodes, transitions):
+    """
+    DESCRIPTION:
+    A function to compute, for all the networks at once, the number of 
+    node values in which the synchronous successor of the observed states
+    differs from the observed next states. The mismatches of every node and
+    transition are an integer with one bit per network, and they are added
+    in bit-sliced counters: the counter j stores the bit j of the score of
+    every network.
+    :param networks: [list] boolean networks (dict) to score.
+    :param nodes: [tuple] the nodes in the order of the states.
+    :param transitions: [list] observed transitions, pairs of states (str).
+    :return: [list] the mismatch score (int) of every network.
+    """
+    counters = []
+    node_masks = [function_masks(networks, node) for node in nodes]
+    for state, next_state in transitions:
+        for i in range(len(nodes)):
+            # Networks whose successor does not reproduce the node value
+            carry = agreement_mask(node_masks[i], state, next_state[i] != '1')
+            # Ripple-carry addition of the mismatches to the counters
+            j = 0
+            while carry:
+                if j == len(counters):
+                    counters.append(0)
+                counters[j], carry = counters[j] ^ carry, counters[j] & carry
+                j += 1
+    # Unpack every counter once and add its weight to the scores
+    scores = [0] * len(networks)
+    for j in range(len(counters)):
+        bits = mask2bits(counters[j], len(networks))
+        position = bits.find('1')
+        while position != -1:
+            scores[position] += 1 << j
+            position = bits.find('1', position + 1)
+    return scores
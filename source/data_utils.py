@@ -1,6 +1,58 @@
-
 """
 DESCRIPTION:
 - Functions to load and format data.
 Author: Mario Rubio.
 """
+
+# Libraries
+import os
+import json
+
+
+# Functions
+def merge_shards(shard_paths):
+    """
+    DESCRIPTION:
+    A function to combine the networks saved by several shards with
+    Graph.save_networks_to_json. The networks are sorted by their index
+    and the equivalent networks are removed keeping the first one, as in a
+    run over all the groups and networks, so the merged result is the same.
+    :param shard_paths: [list] paths (str) to the json files of the shards.
+    :return: [dict] the merged content, in the format of the shard files.
+    """
+    nodes = None
+    backend = None
+    networks = []
+    for shard_path in shard_paths:
+        with open(shard_path, "r") as file:
+            shard = json.load(file)
+        if nodes is None:
+            nodes, backend = shard['nodes'], shard['backend']
+        elif shard['nodes'] != nodes or shard['backend'] != backend:
+            raise ValueError(f'Shard {shard_path} comes from a different graph or backend')
+        networks.extend(shard['networks'])
+    # Filter the equivalent networks across shards
+    codes = set()
+    merged_networks = []
+    for network in sorted(networks, key=lambda network: network['index']):
+        code = tuple(tuple(network['code'][node]) for node in nodes)
+        if code not in codes:
+            merged_networks.append(network)
+            codes.add(code)
+    return {'nodes': nodes, 'backend': backend, 'networks': merged_networks}
+
+def print_merged_networks_to_folder(merged, folder_path, prefix="network"):
+    """
+    DESCRIPTION:
+    A function to write the merged networks into a specified folder, in the
+    same format as Graph.print_networks_to_folder.
+    :param merged: [dict] the merged content, as returned by merge_shards.
+    :param folder_path: [str] path to the folder to store the networks.
+    :param prefix: [str] prefix to name the network files.
+    """
+    os.makedirs(folder_path, exist_ok=True)
+    i = 0
+    for network in merged['networks']:
+        with open(folder_path + f"/{prefix}_{i}.txt", "w") as file:
+            file.write("\n".join([f"{node}, " + network['expressions'][node] for node in merged['nodes']]))
+        i += 1
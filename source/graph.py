@@ -1,20 +1,25 @@
 
 # Libraries
 import os
+import json
 import itertools
-from random import sample
+from bisect import bisect_right
+from random import sample, Random
 from string import ascii_uppercase, digits
-from tqdm import tqdm
-from source.ncbf_utils import ncbf_generator
-from source.bn_utils import prefilter_by_attractor
+from source.ncbf_utils import ncbf_generator, ncbf_count, ncbf_orders
+from source.bn_utils import prefilter_by_attractor, prefilter_node_by_attractor
 from source.bn_utils import minterms2bnet
+from source.bn_utils import screen_perturbations, score_transitions
+from source.index_utils import CandidateIndex
 
 
 # Classes
 class Graph:
 
     # Methods
-    def __init__(self, activators, inhibitors, attractors, networks_path):
+    def __init__(self, activators, inhibitors, attractors, networks_path,
+        limit=None, search_order=None, backend="explicit", max_layers=None,
+        max_layer_size=None, transitions=None):
         """
         DESCRIPTION:
         The constructor of the Graph object. All the network inference
@@ -25,6 +30,19 @@ class Graph:
         :param attractors: [list] a list with the searched attractors in str 
         format.
         :param networks_path: [str] path to folder to print the networks in.
+        :param limit: [int] if given, the generation of NCBFs stops as soon as 
+        this number of distinct networks holding the attractors is found.
+        :param search_order: [str] order in which the NCBFs of every node are
+        searched, a key of ncbf_orders (e.g. 'fewest_layers'). None keeps the
+        order of the enumeration.
+        :param backend: [str] representation of the boolean functions. 
+        'explicit' stores them as sets of minterms, and 'symbolic' as BDDs, 
+        so that no set of size 2^n_nodes is ever built.
+        :param max_layers: [int] maximum number of canalising layers of the
+        NCBFs. The enumeration does not develop longer NCBFs.
+        :param max_layer_size: [int] maximum number of nodes per layer.
+        :param transitions: [list] observed transitions of the time series, 
+        pairs of binarised states in str format.
         """
         # Always, the nodes are ordered alphabetically
         self.nodes = tuple(sorted(activators.keys()))
@@ -34,16 +52,35 @@ class Graph:
             for key in inhibitors.keys()}
         self.n_nodes = len(self.nodes)
         self.attractors = None if attractors == "None" else attractors
+        self.transitions = None if transitions == "None" else transitions
         # Generate all the possible minterms in a space of len(nodes) variables.
         # IMPORTANT: the node position in every term is alphabetical: A:0, B:1...
-        self.graph_space = frozenset(
-            '{:0{}b}'.format(i, self.n_nodes) for i in range(2 ** self.n_nodes)
-            )
+        self.backend = backend
+        if self.backend == "explicit":
+            self.graph_space = frozenset(
+                '{:0{}b}'.format(i, self.n_nodes) for i in range(2 ** self.n_nodes)
+                )
+        elif self.backend == "symbolic":
+            # The variable of every node in the BDDs is its position
+            # NOTE: the backend is only loaded when it is used.
+            from source.bdd_utils import BDDManager
+            self.bdd_manager = BDDManager(self.n_nodes)
+            self.graph_space = self.bdd_manager.true
+        else:
+            raise AttributeError('Introduced non-valid backend')
         # Check for input nodes
         self.input_nodes = tuple([node for node in self.nodes 
             if not self.activators[node] and not self.inhibitors[node]])
         # Path to print the networks
         self.networks_path = networks_path
+        # Early termination of the search
+        self.limit = None if limit == "None" else limit
+        self.search_order = None if search_order == "None" else search_order
+        if self.search_order is not None and self.search_order not in ncbf_orders:
+            raise AttributeError('Introduced non-valid search order')
+        # Pruning of the NCBF enumeration
+        self.max_layers = None if max_layers == "None" else max_layers
+        self.max_layer_size = None if max_layer_size == "None" else max_layer_size
 
     def __str__(self):
         """
@@ -65,8 +102,12 @@ class Graph:
         {self.n_nodes}
         Attractors:
         {self.attractors}
+        Transitions:
+        {self.transitions}
         Input_nodes:
         {self.input_nodes}
+        Number of NCBFs per node before and after pruning:
+        {self.get_ncbf_counts()}
         Number of computed pathway groups:
         {len(self.get_pathway_groups())}
         Number of computed nested canalised boolean functions:
@@ -101,11 +142,29 @@ class Graph:
         """
         DESCRIPTION:
         """
-        if "ncbf_networks" in dir(self):
+        if "filtered_ncbf_networks" in dir(self):
             return self.filtered_ncbf_networks
         else:
             return []
         
+    def get_sampled_networks(self):
+        """
+        DESCRIPTION:
+        """
+        if "sampled_networks" in dir(self):
+            return self.sampled_networks
+        else:
+            return []
+
+    def get_ncbf_counts(self):
+        """
+        DESCRIPTION:
+        """
+        if "ncbf_counts" in dir(self):
+            return self.ncbf_counts
+        else:
+            return {}
+
     def get_networks(self):
         """
         DESCRIPTION:
@@ -115,69 +174,83 @@ class Graph:
         else:
             return []
 
-    def obtain_pathways_from_graph(self):
+    def get_ncbf_network_indices(self):
         """
         DESCRIPTION:
-        The method to obtain all the possible groups of pathways from the graph 
-        based on the pairs of canalising/canalised values described in the 
-        article. The groups are added to the Graph object. Every pathway is a 
-        tuple in which the fields have the following meaning:
-        1. Antecedent: [str] expression describing the cause of the effect.
-        2. Consequent: [str] expression describing the nodes that suffers the 
-        effect.
-        3. Activator: [bool] a flag to indicate if the pathway is an activator 
-        of the consequent (True) or not (False).
-        4. Domain: [set] strings that represent the minterms of the expression
-        present in the left side of the pathway. The right side is always
-        exactly the letter shown in the consequent field, there is no need to 
-        represent that function.
         """
-        # Helper functions
-        def pathway_serializer(antecedent, consequent, definition):
-            """
-            DESCRIPTION: 
-            Helper function for the list comprehension of below. 
-            :param antecedent: [str] value to write in the left side of the
-            pathway.
-            :param consequent: [str] value to write in the right side of the
-            pathway.
-            :param definition: [tuple] canalising/canalised value pair of the
-            pathway.
-            :return: [dict] formatted pathway.
-            """
-            return {
-                'id': ''.join(sample(ascii_uppercase + digits, 5)),
-                'antecedent': antecedent,
-                'consequent': consequent,
-                'activator': bool(definition[1]),
-                'domain': frozenset(filter(
-                    lambda term: term[self.nodes.index(antecedent)] == str(definition[0]),
-                    self.graph_space))}
-        
-        def pathway_manager(pathway_group, input_pathways):
-            """
-            DESCRIPTION:
-            Helper function to organise the pathways first by node and after
-            by activators and inhibitors. In the code, every activator will have
-            a canalised value of 1 and vice versa. The function changes the sense
-            of activator and inhibitor. From now on, activator has a canalised
-            value of 1 and inhibitor of 0.
-            :param pathway_group: [tuple] the two lists of activators and 
-            inhibitors.
-            :param input_pathways: [dict] pathways of the input nodes. They are 
-            the same for every group.
-            :return: [dict] the pathways grouped by node and activators/inhibitors.
-            """
-            # Format the pathways
-            pathways = [it for sb in pathway_group for it in sb]
-            pathways = {node: {'activators': list(filter(lambda pathway: (pathway['consequent'] == node) and pathway['activator'], pathways)),
-                                'inhibitors': list(filter(lambda pathway: (pathway['consequent'] == node) and not pathway['activator'], pathways))}
-                for node in self.nodes}
-            # Introduce the input pathways
-            [pathways.update({node: input_pathways[node]}) for node in input_pathways.keys()]
-            return pathways
-        
-        # Create all the pathways with both canalising/canalised pairs
+        if "ncbf_network_indices" in dir(self):
+            return self.ncbf_network_indices
+        else:
+            return None
+
+    def get_network_indices(self):
+        """
+        DESCRIPTION:
+        """
+        if "network_indices" in dir(self):
+            return self.network_indices
+        else:
+            return None
+
+    def _serialize_pathway(self, antecedent, consequent, definition):
+        """
+        DESCRIPTION: 
+        Helper method to build a single pathway. 
+        :param antecedent: [str] value to write in the left side of the
+        pathway.
+        :param consequent: [str] value to write in the right side of the
+        pathway.
+        :param definition: [tuple] canalising/canalised value pair of the
+        pathway.
+        :return: [dict] formatted pathway.
+        """
+        if self.backend == "symbolic":
+            domain = self.bdd_manager.literal(self.nodes.index(antecedent), definition[0])
+        else:
+            domain = frozenset(filter(
+                lambda term: term[self.nodes.index(antecedent)] == str(definition[0]),
+                self.graph_space))
+        return {
+            'id': ''.join(sample(ascii_uppercase + digits, 5)),
+            'antecedent': antecedent,
+            'consequent': consequent,
+            'activator': bool(definition[1]),
+            'domain': domain}
+
+    def _organise_pathways(self, pathway_group, input_pathways):
+        """
+        DESCRIPTION:
+        Helper method to organise the pathways first by node and after
+        by activators and inhibitors. In the code, every activator will have
+        a canalised value of 1 and vice versa. The method changes the sense
+        of activator and inhibitor. From now on, activator has a canalised
+        value of 1 and inhibitor of 0.
+        :param pathway_group: [tuple] the two lists of activators and 
+        inhibitors.
+        :param input_pathways: [dict] pathways of the input nodes. They are 
+        the same for every group.
+        :return: [dict] the pathways grouped by node and activators/inhibitors.
+        """
+        # Format the pathways
+        pathways = [it for sb in pathway_group for it in sb]
+        pathways = {node: {'activators': list(filter(lambda pathway: (pathway['consequent'] == node) and pathway['activator'], pathways)),
+                            'inhibitors': list(filter(lambda pathway: (pathway['consequent'] == node) and not pathway['activator'], pathways))}
+            for node in self.nodes}
+        # Introduce the input pathways
+        [pathways.update({node: input_pathways[node]}) for node in input_pathways.keys()]
+        return pathways
+
+    def _create_edge_pathways(self):
+        """
+        DESCRIPTION:
+        Helper method to create, for every edge of the graph, the two pathways
+        with both canalising/canalised pairs. The edges are ordered by node
+        first, and by activator/inhibitor second. This order defines the index
+        of every pathway group: the group i is the i-th element of the
+        product of the activator edges followed by the inhibitor edges.
+        :return: [tuple] the activator edges, the inhibitor edges (lists of
+        pathway pairs) and the pathways of the input nodes (dict).
+        """
         activator_pathways = [[None] * len(self.activators[node]) for node in self.nodes]
         inhibitor_pathways = [[None] * len(self.inhibitors[node]) for node in self.nodes]
         i = 0
@@ -185,32 +258,71 @@ class Graph:
             j = 0
             for activator in self.activators[node]:
                 activator_pathways[i][j] = [
-                    pathway_serializer(activator, node, (0, 0)),
-                    pathway_serializer(activator, node, (1, 1))
+                    self._serialize_pathway(activator, node, (0, 0)),
+                    self._serialize_pathway(activator, node, (1, 1))
                 ]
                 j += 1
             j = 0
             for inhibitor in self.inhibitors[node]:
                 inhibitor_pathways[i][j] = [
-                    pathway_serializer(inhibitor, node, (0, 1)),
-                    pathway_serializer(inhibitor, node, (1, 0))
+                    self._serialize_pathway(inhibitor, node, (0, 1)),
+                    self._serialize_pathway(inhibitor, node, (1, 0))
                 ]
                 j += 1
             i += 1
         activator_pathways = [it for sb in activator_pathways for it in sb]
-        activator_pathways = itertools.product(*activator_pathways)
         inhibitor_pathways = [it for sb in inhibitor_pathways for it in sb]
-        inhibitor_pathways = itertools.product(*inhibitor_pathways)
-        pathways = itertools.product(activator_pathways, inhibitor_pathways)
         # Obtain the pathways of the inputs (from and to themselves)
         input_pathways = {node: [] for node in self.input_nodes}
         for node in self.input_nodes:
             input_pathways[node] = {
-                'activators': [pathway_serializer(node, node, (1, 1))],
-                'inhibitors': [pathway_serializer(node, node, (0, 0))]
+                'activators': [self._serialize_pathway(node, node, (1, 1))],
+                'inhibitors': [self._serialize_pathway(node, node, (0, 0))]
             }
+        return activator_pathways, inhibitor_pathways, input_pathways
+
+    def obtain_pathways_from_graph(self, shard=None):
+        """
+        DESCRIPTION:
+        The method to obtain all the possible groups of pathways from the graph 
+        based on the pairs of canalising/canalised values described in the 
+        article. The groups are added to the Graph object. Every pathway is a 
+        tuple in which the fields have the following meaning:
+        1. Antecedent: [str] expression describing the cause of the effect.
+        2. Consequent: [str] expression describing the nodes that suffers the 
+        effect.
+        3. Activator: [bool] a flag to indicate if the pathway is an activator 
+        of the consequent (True) or not (False).
+        4. Domain: [set] strings that represent the minterms of the expression
+        present in the left side of the pathway. The right side is always
+        exactly the letter shown in the consequent field, there is no need to 
+        represent that function.
+        The index of every group is its position in the product of the edges,
+        which does not depend on the random ids of the pathways. With a shard
+        (i, n), only the groups whose index is i modulo n are built, so that n
+        independent runs cover all the groups.
+        :param shard: [tuple] the shard i of n to build. None means all.
+        """
+        # Create all the pathways with both canalising/canalised pairs
+        activator_pathways, inhibitor_pathways, input_pathways = self._create_edge_pathways()
+        n_groups = 2 ** (len(activator_pathways) + len(inhibitor_pathways))
+        shard_index, n_shards = (0, 1) if shard is None else shard
+        self.pathway_group_indices = range(shard_index, n_groups, n_shards)
+        # NOTE: a single product keeps the order of the product of the activator
+        # and the inhibitor products without storing any of them.
+        n_activators = len(activator_pathways)
+        pathways = ((group[:n_activators], group[n_activators:])
+            for group in itertools.islice(itertools.product(*(activator_pathways + inhibitor_pathways)),
+                shard_index, None, n_shards))
         # Organise every group by node first and by activator/inhibitor second
-        self.pathway_groups = [pathway_manager(group, dict(input_pathways)) for group in pathways]
+        pathway_groups = (self._organise_pathways(group, dict(input_pathways)) for group in pathways)
+        # With a limit, the groups are only built when the search reaches them.
+        # The pathway groups are then the ones visited by the search.
+        if self.limit is not None:
+            self.pending_pathway_groups = pathway_groups
+            self.pathway_groups = []
+        else:
+            self.pathway_groups = list(pathway_groups)
 
     def generate_priority_matrices(self):
         """
@@ -247,30 +359,159 @@ class Graph:
         # Store the matrices
         self.priority_matrices = zip(activator_matrices, inhibitor_matrices)
     
-    def generate_NCBFs(self):
+    def _node_ncbfs(self, node, pathways):
+        """
+        DESCRIPTION:
+        Helper method to generate the NCBFs of a node with the search order
+        and the pruning options of the Graph object. The input nodes are not
+        pruned, their pathways only describe their own persistence.
+        :param node: [str] the node whose NCBFs are generated.
+        :param pathways: [dict] the activator and inhibitor pathways of the node.
+        :return: [list] the domain of every NCBF.
+        """
+        if node in self.input_nodes:
+            return ncbf_generator(pathways['activators'], pathways['inhibitors'], self.graph_space,
+                set(self.nodes), self.search_order)
+        return ncbf_generator(pathways['activators'], pathways['inhibitors'], self.graph_space,
+            set(self.nodes), self.search_order, self.max_layers, self.max_layer_size)
+
+    def _node_ncbf_count(self, node, pathways, pruned=True):
+        """
+        DESCRIPTION:
+        Helper method to count the NCBFs of a node without building them.
+        Every pathway is a different variable of the NCBFs, since the 
+        repeated and contradictory antecedents are renamed.
+        :param node: [str] the node whose NCBFs are counted.
+        :param pathways: [dict] the activator and inhibitor pathways of the node.
+        :param pruned: [bool] if True, the pruning options are applied.
+        :return: [int] the number of NCBFs.
+        """
+        if pruned and node not in self.input_nodes:
+            return ncbf_count(len(pathways['activators']), len(pathways['inhibitors']),
+                self.max_layers, self.max_layer_size)
+        return ncbf_count(len(pathways['activators']), len(pathways['inhibitors']))
+
+    def count_NCBFs(self):
+        """
+        DESCRIPTION:
+        A method to count, for every node, the NCBFs over all the choices of
+        pathways of its edges, before and after the pruning by max_layers and 
+        max_layer_size. Nothing is enumerated. The counts are added to the 
+        Graph object.
+        :return: [dict] the counts per node, {node: {'before': x, 'after': y}}.
+        """
+        activator_pathways, inhibitor_pathways, input_pathways = self._create_edge_pathways()
+        edge_pathways = activator_pathways + inhibitor_pathways
+        self.ncbf_counts = {}
+        for node in self.nodes:
+            node_edges = [pair for pair in edge_pathways if pair[0]['consequent'] == node]
+            counts = {'before': 0, 'after': 0}
+            for pattern in itertools.product((0, 1), repeat=len(node_edges)):
+                pathways = self._node_pathways(node, node_edges, input_pathways, pattern)
+                counts['before'] += self._node_ncbf_count(node, pathways, pruned=False)
+                counts['after'] += self._node_ncbf_count(node, pathways)
+            self.ncbf_counts[node] = counts
+        print(f'NCBFs per node before and after pruning: {self.ncbf_counts}')
+        return self.ncbf_counts
+
+    def _network_code(self, network):
+        """
+        DESCRIPTION:
+        Helper method to obtain a code that is the same for equivalent networks.
+        Both the sets of minterms and the BDDs are canonical and hashable, so
+        the code is the tuple of the node functions.
+        :param network: [dict] the network to encode.
+        :return: [tuple] the code of the network.
+        """
+        return tuple(network[node] for node in sorted(network.keys()))
+
+    def _generate_limited_NCBFs(self):
+        """
+        DESCRIPTION:
+        A method to search the NCBF networks group by group, stopping as soon 
+        as the limit of distinct networks holding the attractors is reached.
+        The attractor condition is checked node by node before combining the
+        NCBFs, so every combination is a hit. The NCBFs of every node are 
+        visited in the search order. The networks found are added to the 
+        Graph object, and the pathway groups are the visited ones.
+        The index of every network is its position among the NCBFs that 
+        agree with the attractors, not among all the NCBFs of the group.
+        """
+        print(f"Searching the first {self.limit} networks:")
+        attractors = self.attractors if self.attractors else []
+        codes = set()
+        visited_groups = []
+        ncbf_networks = []
+        ncbf_network_indices = []
+        for group_index, group in zip(self.pathway_group_indices, self.pending_pathway_groups):
+            if len(ncbf_networks) >= self.limit:
+                break
+            visited_groups.append(group)
+            ncbf_group = [
+                list(prefilter_node_by_attractor(i, self._node_ncbfs(self.nodes[i], group[self.nodes[i]]), attractors))
+                for i in range(self.n_nodes)
+            ]
+            for position, network in enumerate(itertools.product(*ncbf_group)):
+                network = dict(zip(self.nodes, network))
+                code = self._network_code(network)
+                if code not in codes:
+                    ncbf_networks.append(network)
+                    ncbf_network_indices.append((group_index, position))
+                    codes.add(code)
+                    if len(ncbf_networks) >= self.limit:
+                        break
+        print(f'Networks found: {len(ncbf_networks)} in {len(visited_groups)} pathway groups')
+        self.pathway_groups = visited_groups
+        self.ncbf_networks = ncbf_networks
+        self.ncbf_network_indices = ncbf_network_indices
+        self.networks = self.ncbf_networks
+        self.network_indices = self.ncbf_network_indices
+
+    def generate_NCBFs(self, shard=None):
         """
         DESCRIPTION:
         A method to build all the groups of NCBF based on the pathway groups. 
         Multiple NCBF groups are built per pathway group. The information about the 
         canalising/canalised pairs is already stored in the pathways. The NCBF
         groups are added to the Graph object.
+        Every network is indexed by the index of its pathway group and its 
+        position in the product of the NCBFs of the group. With a shard (i, n),
+        only the networks whose position is i modulo n are built in every 
+        group. The shards of this method and of obtain_pathways_from_graph are
+        independent: using both with n1 and n2 shards needs n1 * n2 runs.
+        The networks of the search with a limit cannot be sharded, only its
+        pathway groups.
+        :param shard: [tuple] the shard i of n to build. None means all.
         """
+        if shard is not None and self.limit is not None:
+            raise ValueError('The networks cannot be sharded with a limit, shard the pathway groups instead')
+        if self.max_layers is not None or self.max_layer_size is not None:
+            self.count_NCBFs()
+        if self.limit is not None:
+            self._generate_limited_NCBFs()
+            return
+        # NOTE: the progress bars are only loaded when they are used.
+        from tqdm import tqdm
         # Helper functions
         # There two depending on whether the pathways groups are mixed or not for
         # the ncbf and the conflicts strategy
         def ncbf_formatter_standard(ncbf_group, pathway_group_id):
             # This function assigns the ID of the pathways used to build the network
-            networks = [dict(zip(self.nodes, network)) for network in itertools.product(*ncbf_group)]
-            return zip([pathway_group_id] * len(networks), networks)
+            # and the position of the network in the group
+            networks = [dict(zip(self.nodes, network)) for network in 
+                itertools.islice(itertools.product(*ncbf_group), shard_index, None, n_shards)]
+            positions = range(shard_index, shard_index + n_shards * len(networks), n_shards)
+            return zip([(pathway_group_id, position) for position in positions], networks)
 
         def ncbf_formatter_mixed_pathways(ncbf_group):
             # This assigns the prefixed ID of pathways independently of the network
             networks = [dict(zip(self.nodes, network)) for network in itertools.product(*ncbf_group)]
             return zip([self.pathways_index] * len(networks), networks)
 
+        shard_index, n_shards = (0, 1) if shard is None else shard
         # Generate by node all the NCBFs
         print("Generating NCBF from the pathway groups:")
-        total_ncbf = [[ncbf_generator(group[node]['activators'], group[node]['inhibitors'], self.graph_space, set(self.nodes)) 
+        total_ncbf = [[self._node_ncbfs(node, group[node]) 
             for node in self.nodes] for group in tqdm(self.pathway_groups)]
         # # Format all the NCBF groups conveniently: (pathway group position, NCBF
         # # network in dict). 
@@ -279,21 +520,23 @@ class Graph:
         # else:
         #     pre_networks = [it for sb in [ncbf_formatter_standard(total_ncbf[i], i) for i in range(len(total_ncbf))] for it in sb]
         print("Formatting networks:")
-        ncbf_networks = [it for sb in [ncbf_formatter_standard(total_ncbf[i], i) for i in tqdm(range(len(total_ncbf)))] for it in sb]
+        ncbf_networks = [it for sb in [ncbf_formatter_standard(total_ncbf[i], self.pathway_group_indices[i]) for i in tqdm(range(len(total_ncbf)))] for it in sb]
         # Filter the equivalent networks
-        codes = []
+        codes = set()
         final_ncbf_networks = []
         print("Filter equivalent networks:")
         for network in tqdm(ncbf_networks):
             # code = str(network[0]) + '$$' + '&'.join(['|'.join(sorted(net)) for _, net in sorted(network[1].items(), key=lambda x: x[0])])
-            code = '&'.join(['|'.join(sorted(net)) for _, net in sorted(network[1].items(), key=lambda x: x[0])])
+            code = self._network_code(network[1])
             if code not in codes:
                 final_ncbf_networks.append(network)
-                codes.append(code)
+                codes.add(code)
         # Store NCBF networks
-        # NOTE: remove ID because we do not need to match with the pathways again.
+        # NOTE: the IDs are stored apart to merge the outputs of the shards.
         self.ncbf_networks = [net[1] for net in final_ncbf_networks]
+        self.ncbf_network_indices = [net[0] for net in final_ncbf_networks]
         self.networks = self.ncbf_networks
+        self.network_indices = self.ncbf_network_indices
     
     def prefilter(self):
         """
@@ -302,17 +545,295 @@ class Graph:
         A cheap prefiltering before computing the attractors with the Tarjan algorithm and 
         PyBoolNet.
         """
+        networks = self.get_ncbf_networks()
+        indices = self.get_ncbf_network_indices()
         if (self.attractors is not None) and (self.attractors != []):
             print("Performing attractor-based filtering...")
-            self.filtered_ncbf_networks = list(filter(lambda network: network is not None, self.get_ncbf_networks()))
-            if self.filtered_ncbf_networks:
-                self.filtered_ncbf_networks = list(prefilter_by_attractor(self.filtered_ncbf_networks, self.attractors))
+            # NOTE: the positions are kept to select the indices of the networks.
+            selected = [k for k in range(len(networks)) if networks[k] is not None
+                and list(prefilter_by_attractor([networks[k]], self.attractors))]
+            self.filtered_ncbf_networks = [networks[k] for k in selected]
             self.networks = self.filtered_ncbf_networks
+            self.network_indices = None if indices is None else [indices[k] for k in selected]
             print(f'Total networks after prefiltering: {len(self.filtered_ncbf_networks)}')
         else:
             print('No attractor-based prefiltering performed')
-            self.filtered_ncbf_networks = self.get_ncbf_networks()
+            self.filtered_ncbf_networks = networks
             self.networks = self.filtered_ncbf_networks
+            self.network_indices = indices
+
+    def screen_perturbations(self, attractors=None):
+        """
+        DESCRIPTION:
+        A method to screen which single-node knockouts and overexpressions
+        preserve the attractors in the current networks. The function of the 
+        perturbed node is clamped to 0 or 1 on the in-memory domains, and 
+        all the networks and perturbations are checked in one bit-parallel
+        pass. The result is added to the Graph object.
+        :param attractors: [list] attractors (str) that should be preserved.
+        None means the attractors of the Graph object.
+        :return: [tuple] the perturbations, (node, clamped value), and the 
+        result matrix, one row per network and one column per perturbation, 
+        True if all the attractors, with the perturbed node set to its clamped
+        value, remain steady states.
+        """
+        if attractors is None:
+            attractors = self.attractors
+        if not attractors:
+            print('No attractors to screen the perturbations')
+            return [], []
+        print("Screening perturbations...")
+        self.perturbations, self.perturbation_matrix = screen_perturbations(
+            self.get_networks(), self.nodes, attractors)
+        return self.perturbations, self.perturbation_matrix
+
+    def score_networks(self, transitions=None, threshold=None, top_k=None):
+        """
+        DESCRIPTION:
+        A method to score the current networks against the observed 
+        transitions of a time series. The score of a network is the number of
+        node values in which its synchronous successor of the observed states 
+        differs from the observed next states. All the networks are scored
+        at once in a bit-parallel evaluation. The selected networks and all 
+        the scores are added to the Graph object.
+        :param transitions: [list] observed transitions, pairs of states 
+        (str). None means the transitions of the Graph object.
+        :param threshold: [int] maximum score of the selected networks. None
+        means no threshold.
+        :param top_k: [int] if given, only the k networks with the lowest 
+        scores are selected, in order of score.
+        :return: [list] the scores of the selected networks.
+        """
+        if transitions is None:
+            transitions = self.transitions
+        if not transitions:
+            print('No transition-based scoring performed')
+            return []
+        print("Scoring networks against the transitions...")
+        networks = self.get_networks()
+        indices = self.get_network_indices()
+        self.transition_scores = score_transitions(networks, self.nodes, transitions)
+        selected = [k for k in range(len(networks))
+            if threshold is None or self.transition_scores[k] <= threshold]
+        if top_k is not None:
+            selected = sorted(selected, key=lambda k: self.transition_scores[k])[:top_k]
+        self.scored_networks = [networks[k] for k in selected]
+        self.networks = self.scored_networks
+        self.network_indices = None if indices is None else [indices[k] for k in selected]
+        print(f'Total networks after scoring: {len(self.scored_networks)}')
+        return [self.transition_scores[k] for k in selected]
+
+    def build_candidate_index(self):
+        """
+        DESCRIPTION:
+        A method to index the deduplicated NCBF networks, so that different
+        attractors can be queried without generating them again. The index 
+        is added to the Graph object. The networks found with a limit already 
+        passed the attractors and are not all the candidates, so they cannot
+        be indexed.
+        """
+        if self.limit is not None:
+            raise ValueError('The candidates cannot be indexed with a limit')
+        print("Indexing candidate networks...")
+        self.candidate_index = CandidateIndex.from_networks(self.nodes, self.get_ncbf_networks())
+
+    def save_candidate_index(self, file_path):
+        """
+        DESCRIPTION:
+        Method to write the candidate index into a json file.
+        :param file_path: [str] path to the json file.
+        """
+        self.candidate_index.save(file_path, self.backend)
+
+    def load_candidate_index(self, file_path):
+        """
+        DESCRIPTION:
+        Method to read a candidate index saved with save_candidate_index. The
+        indexed networks become the NCBF networks of the Graph object.
+        :param file_path: [str] path to the json file.
+        """
+        bdd_manager = self.bdd_manager if self.backend == "symbolic" else None
+        self.candidate_index = CandidateIndex.load(file_path, bdd_manager)
+        if self.candidate_index.nodes != self.nodes:
+            raise ValueError('The candidate index comes from a different graph')
+        self.ncbf_networks = self.candidate_index.get_networks()
+        self.ncbf_network_indices = None
+        self.networks = self.ncbf_networks
+        self.network_indices = None
+
+    def query_candidates(self, attractors=None):
+        """
+        DESCRIPTION:
+        A method to select the indexed networks in which all the attractors
+        are steady states, by intersection of the index. The result is the 
+        same as prefilter, and it is stored in the same way.
+        :param attractors: [list] attractors (str). None means the attractors
+        of the Graph object.
+        :return: [list] the selected networks.
+        """
+        if attractors is None:
+            attractors = self.attractors
+        if not attractors:
+            self.filtered_ncbf_networks = self.candidate_index.get_networks()
+        else:
+            self.filtered_ncbf_networks = self.candidate_index.get_networks(
+                self.candidate_index.query(attractors))
+        self.networks = self.filtered_ncbf_networks
+        self.network_indices = None
+        print(f'Total networks after querying: {len(self.filtered_ncbf_networks)}')
+        return self.filtered_ncbf_networks
+
+    def count_candidates(self, attractors=None):
+        """
+        DESCRIPTION:
+        A method to count the indexed networks in which all the attractors
+        are steady states, without building them.
+        :param attractors: [list] attractors (str). None means the attractors
+        of the Graph object.
+        :return: [int] the number of networks.
+        """
+        if attractors is None:
+            attractors = self.attractors
+        if not attractors:
+            return len(self.candidate_index.networks)
+        return self.candidate_index.count(attractors)
+
+    def _node_pathways(self, node, edge_pathways, input_pathways, pattern):
+        """
+        DESCRIPTION:
+        Helper method to obtain the pathways targeting a node given the
+        pathway selected for every edge of the node.
+        :param node: [str] the node whose pathways are obtained.
+        :param edge_pathways: [list] pathway pairs of the edges targeting the
+        node.
+        :param input_pathways: [dict] pathways of the input nodes.
+        :param pattern: [tuple] selected pathway (0 or 1) per edge of the node.
+        :return: [dict] the activator and inhibitor pathways of the node.
+        """
+        if node in input_pathways:
+            return input_pathways[node]
+        pathways = [edge_pathways[i][pattern[i]] for i in range(len(pattern))]
+        return self._organise_pathways([pathways], {})[node]
+
+    def sample_networks(self, k, seed=None, filter_attractors=False, max_draws=None):
+        """
+        DESCRIPTION:
+        A method to draw networks uniformly from the space of pathway groups
+        times per-node NCBFs without enumerating it. Since every edge belongs
+        to the node it targets, the space factorises by node: the local space
+        of a node gathers, for every choice of pathways of its edges, all the
+        NCBFs built from them. Every network is then denoted by a mixed-radix
+        index with one digit per node, and the digit is unranked into the
+        pathway choice and the NCBF of the node. Only the NCBFs are counted
+        beforehand, and only the domains of the drawn networks are
+        computed, so the cost scales with k and not with the space size. The
+        sampled networks are added to the Graph object. Equivalent networks
+        are not removed, as in the enumeration before the filtering of
+        equivalent networks.
+        :param k: [int] number of distinct indices to draw.
+        :param seed: [int] seed of the random generator, for reproducibility.
+        :param filter_attractors: [bool] if True, only the networks holding
+        all the attractors are kept, and the drawing continues until k
+        networks pass the filter.
+        :param max_draws: [int] maximum number of indices to draw, bounded by
+        the space size. None means k without the filter and 100 * k with it,
+        so the drawing always ends even if few networks pass the filter.
+        :return: [list] the sampled networks (dict).
+        """
+        random_generator = Random(seed)
+        activator_pathways, inhibitor_pathways, input_pathways = self._create_edge_pathways()
+        edge_pathways = activator_pathways + inhibitor_pathways
+        node_edges = {node: [pair for pair in edge_pathways if pair[0]['consequent'] == node]
+            for node in self.nodes}
+        # Count the NCBFs of every pathway choice of every node
+        node_patterns = {}
+        node_offsets = {}
+        radices = []
+        for node in self.nodes:
+            patterns = list(itertools.product((0, 1), repeat=len(node_edges[node])))
+            offsets = [0]
+            for pattern in patterns:
+                pathways = self._node_pathways(node, node_edges[node], input_pathways, pattern)
+                offsets.append(offsets[-1] + self._node_ncbf_count(node, pathways))
+            node_patterns[node] = patterns
+            node_offsets[node] = offsets
+            radices.append(offsets[-1])
+        space_size = 1
+        for radix in radices:
+            space_size *= radix
+        # Cache of the NCBF domains of every node given the pathways of its edges
+        ncbf_cache = {}
+
+        def node_ncbf(node, local_index):
+            """
+            DESCRIPTION:
+            Helper function to unrank the local index of a node into one of
+            its NCBF domains.
+            :param node: [str] the node whose NCBF is obtained.
+            :param local_index: [int] the index in the local space of the node.
+            :return: [frozenset] the domain of the NCBF.
+            """
+            position = bisect_right(node_offsets[node], local_index) - 1
+            pattern = node_patterns[node][position]
+            if (node, pattern) not in ncbf_cache:
+                pathways = self._node_pathways(node, node_edges[node], input_pathways, pattern)
+                ncbf_cache[(node, pattern)] = self._node_ncbfs(node, pathways)
+            return ncbf_cache[(node, pattern)][local_index - node_offsets[node][position]]
+
+        filter_attractors = filter_attractors and bool(self.attractors)
+        # Draw the indices
+        networks = []
+        drawn = set()
+        if max_draws is None:
+            max_draws = 100 * k if filter_attractors else k
+        max_draws = min(space_size, max_draws)
+        while len(networks) < k and len(drawn) < max_draws:
+            index = random_generator.randrange(space_size)
+            if index in drawn:
+                continue
+            drawn.add(index)
+            # Unrank the index, the first node is the most significant digit
+            local_indices = [0] * self.n_nodes
+            for i in reversed(range(self.n_nodes)):
+                index, local_indices[i] = divmod(index, radices[i])
+            network = {self.nodes[i]: node_ncbf(self.nodes[i], local_indices[i])
+                for i in range(self.n_nodes)}
+            if filter_attractors and not list(prefilter_by_attractor([network], self.attractors)):
+                continue
+            networks.append(network)
+        print(f'Sampled networks: {len(networks)} from {len(drawn)} draws in a space of {space_size}')
+        if len(networks) < k:
+            print(f'Warning: the drawing stopped at {len(drawn)} draws before finding {k} networks')
+        self.sampled_networks = networks
+        self.networks = self.sampled_networks
+        self.network_indices = None
+        return networks
+
+    def save_networks_to_json(self, file_path):
+        """
+        DESCRIPTION:
+        Method to write the current networks with their indices into a json 
+        file, the output of a shard to merge with merge_shards. For every
+        network, the file stores the minterms (explicit backend) or the BDD
+        paths (symbolic backend) of every node, which are canonical and
+        identify equivalent networks, and the expressions in boolnet format.
+        Only the networks of the enumeration have an index: the sampled 
+        networks and the networks of a candidate index cannot be saved.
+        :param file_path: [str] path to the json file.
+        """
+        indices = self.get_network_indices()
+        if indices is None:
+            raise ValueError('The current networks have no index, generate them with generate_NCBFs')
+        print("Saving networks to json")
+        networks = [{
+            'index': list(index),
+            'code': {node: sorted(network[node]) if self.backend == "explicit" 
+                else sorted(network[node].cubes()) for node in self.nodes},
+            'expressions': {node: minterms2bnet(self.nodes, network[node]) for node in self.nodes}
+            } for index, network in zip(indices, self.get_networks())]
+        with open(file_path, "w") as file:
+            json.dump({'nodes': list(self.nodes), 'backend': self.backend, 'networks': networks}, file)
+        print("Networks saved")
 
     def print_networks_to_folder(self, folder_path=None, prefix="network"):
         """
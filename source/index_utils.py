@@ -0,0 +1,180 @@
+"""
+DESCRIPTION:
+- An index of the candidate networks of a graph to answer attractor
+queries without generating the networks again.
+- The index is persisted in a json file, so the same candidates can be
+queried with different attractors in different runs.
+Author: Mario Rubio.
+"""
+
+# Libraries
+import json
+from source.bn_utils import positions2mask, mask2bits
+
+
+# Classes
+class CandidateIndex:
+    """
+    DESCRIPTION:
+    The index of a set of candidate networks. The distinct functions of
+    every node are stored once, and every network is the tuple of the
+    positions of its functions. Two bitmasks answer the queries: for every
+    node and state, the functions of the node that contain the state; and
+    for every node and function, the networks that use it.
+    """
+
+    # Methods
+    def __init__(self, nodes, functions, networks):
+        """
+        DESCRIPTION:
+        Constructor of the class.
+        :param nodes: [tuple] the nodes in the order of the states.
+        :param functions: [dict] the distinct functions (frozenset or
+        BDDFunction) of every node.
+        :param networks: [list] the networks, tuples with the position of the
+        function of every node.
+        """
+        self.nodes = tuple(nodes)
+        self.functions = functions
+        self.networks = networks
+        # Bit k of network_masks[node][j]: the network k uses the function j
+        self.network_masks = {}
+        for i in range(len(self.nodes)):
+            positions = [[] for _ in self.functions[self.nodes[i]]]
+            for k in range(len(self.networks)):
+                positions[self.networks[k][i]].append(k)
+            self.network_masks[self.nodes[i]] = [positions2mask(function_positions, len(self.networks))
+                for function_positions in positions]
+        # Bit j of state_masks[(node, state)]: the function j contains the state
+        # NOTE: filled on demand, the states are not enumerated.
+        self.state_masks = {}
+
+    @classmethod
+    def from_networks(cls, nodes, networks):
+        """
+        DESCRIPTION:
+        Method to build the index from a list of networks.
+        :param nodes: [tuple] the nodes in the order of the states.
+        :param networks: [list] boolean networks (dict) to index.
+        :return: [CandidateIndex] the index.
+        """
+        positions = {node: {} for node in nodes}
+        functions = {node: [] for node in nodes}
+        indexed_networks = []
+        for network in networks:
+            indexed_network = []
+            for node in nodes:
+                if network[node] not in positions[node]:
+                    positions[node][network[node]] = len(functions[node])
+                    functions[node].append(network[node])
+                indexed_network.append(positions[node][network[node]])
+            indexed_networks.append(tuple(indexed_network))
+        return cls(nodes, functions, indexed_networks)
+
+    @classmethod
+    def load(cls, file_path, bdd_manager=None):
+        """
+        DESCRIPTION:
+        Method to load an index saved with save.
+        :param file_path: [str] path to the json file.
+        :param bdd_manager: [BDDManager] the manager to rebuild the functions
+        of the symbolic backend. None for the explicit backend.
+        :return: [CandidateIndex] the index.
+        """
+        with open(file_path, "r") as file:
+            content = json.load(file)
+        if content['backend'] == "symbolic":
+            if bdd_manager is None:
+                raise ValueError('A BDD manager is needed to load a symbolic index')
+            functions = {node: [bdd_manager.from_cubes(cubes) for cubes in content['functions'][node]]
+                for node in content['nodes']}
+        else:
+            functions = {node: [frozenset(minterms) for minterms in content['functions'][node]]
+                for node in content['nodes']}
+        return cls(content['nodes'], functions, [tuple(network) for network in content['networks']])
+
+    def save(self, file_path, backend):
+        """
+        DESCRIPTION:
+        Method to write the index into a json file. The functions are stored
+        as minterms (explicit backend) or BDD paths (symbolic backend).
+        :param file_path: [str] path to the json file.
+        :param backend: [str] the backend of the functions.
+        """
+        if backend == "symbolic":
+            functions = {node: [function.cubes() for function in self.functions[node]]
+                for node in self.nodes}
+        else:
+            functions = {node: [sorted(function) for function in self.functions[node]]
+                for node in self.nodes}
+        with open(file_path, "w") as file:
+            json.dump({'nodes': list(self.nodes), 'backend': backend, 'functions': functions,
+                'networks': [list(network) for network in self.networks]}, file)
+
+    def functions_with_state(self, node, state):
+        """
+        DESCRIPTION:
+        Method to obtain the functions of a node that contain a state.
+        :param node: [str] the node.
+        :param state: [str] the state.
+        :return: [int] bit j is 1 if the function j contains the state.
+        """
+        if (node, state) not in self.state_masks:
+            mask = 0
+            for j in range(len(self.functions[node])):
+                if state in self.functions[node][j]:
+                    mask |= 1 << j
+            self.state_masks[(node, state)] = mask
+        return self.state_masks[(node, state)]
+
+    def query(self, attractors):
+        """
+        DESCRIPTION:
+        Method to select the networks in which all the attractors are steady
+        states. For every node, the allowed functions are the intersection of
+        the state masks of the attractors, and the networks are the
+        intersection over the nodes of the networks using an allowed function.
+        :param attractors: [list] attractors (str) of the networks.
+        :return: [int] bit k is 1 if the network k holds all the attractors.
+        """
+        selected = (1 << len(self.networks)) - 1
+        for i in range(len(self.nodes)):
+            node = self.nodes[i]
+            allowed = (1 << len(self.functions[node])) - 1
+            for attractor in attractors:
+                mask = self.functions_with_state(node, attractor)
+                allowed &= mask if attractor[i] == '1' else ~mask
+            networks = 0
+            while allowed:
+                low = allowed & -allowed
+                networks |= self.network_masks[node][low.bit_length() - 1]
+                allowed ^= low
+            selected &= networks
+        return selected
+
+    def count(self, attractors):
+        """
+        DESCRIPTION:
+        Method to count the networks in which all the attractors are steady
+        states.
+        :param attractors: [list] attractors (str) of the networks.
+        :return: [int] the number of networks.
+        """
+        return bin(self.query(attractors)).count('1')
+
+    def get_networks(self, mask=None):
+        """
+        DESCRIPTION:
+        Method to rebuild the networks of the index.
+        :param mask: [int] bit k is 1 if the network k is selected. None
+        means all the networks.
+        :return: [list] the boolean networks (dict).
+        """
+        if mask is None:
+            positions = range(len(self.networks))
+        else:
+            bits = mask2bits(mask, len(self.networks))
+            positions = [k for k in range(len(self.networks)) if bits[k] == '1']
+        return [{self.nodes[i]: self.functions[self.nodes[i]][self.networks[k][i]]
+            for i in range(len(self.nodes))}
+            for k in positions]
@@ -2,11 +2,21 @@
 
 # Libraries
 import itertools
+from functools import lru_cache
+from math import comb
 from string import ascii_letters, digits, ascii_uppercase
-from random import choice, sample
+from random import sample
 
 
-def ncbf_recursive(group1, group2, n_elements, path=[]):
+# Parameters
+# Orders to sort the NCBFs of a node by their layer structure
+ncbf_orders = {
+    'fewest_layers': len,
+    'most_layers': lambda structure: -len(structure)
+}
+
+
+def ncbf_recursive(group1, group2, n_elements, path=[], max_layers=None):
     """
     DESCRIPTION:
     The algorithm that computes all the possible NCBF for a given node.
@@ -17,6 +27,8 @@ def ncbf_recursive(group1, group2, n_elements, path=[]):
     :param n_elements: [int] number of nodes that should gather all the 
     layers in every NCBF.
     :param path: [list] the layers, that share all the developed NCBF.
+    :param max_layers: [int] maximum number of layers of the NCBFs. The 
+    branches that exceed it are not developed. None means no limit.
     :return: [list] all the NCBFs obtained from this path with these
     activators and inhibitors.
     """
@@ -33,6 +45,9 @@ def ncbf_recursive(group1, group2, n_elements, path=[]):
         layer_elements = set(list(layer))
         return not bool(layer_elements & forbidden_elements)
 
+    # Any NCBF from here needs at least one more layer
+    if max_layers is not None and len(path) >= max_layers and (group1 or group2):
+        return []
     if group1:
         # Recursive case
         ncbfs = []
@@ -43,7 +58,7 @@ def ncbf_recursive(group1, group2, n_elements, path=[]):
             # Filter for incompatible types
             new_group1 = list(filter(kernel, group1))
             ncbfs.append(
-                ncbf_recursive(group2, new_group1, n_elements, path + [group1[i]])
+                ncbf_recursive(group2, new_group1, n_elements, path + [group1[i]], max_layers)
                 )
         ncbfs = [it for sb in ncbfs for it in sb]
     else:
@@ -67,6 +82,8 @@ def ncbf_obtain_domain(structure, info, space, first=False):
     :param first: [bool] a variable that indicates if this instantiation of
     the function is the first or it is a nested one.
     :param space: [set] all the possible terms with the number nodes studied.
+    With the symbolic backend, the domains and the space are BDDFunction 
+    objects, which support the same operations.
     """
     if not structure:
         # Base case
@@ -89,16 +106,19 @@ def ncbf_obtain_domain(structure, info, space, first=False):
                 layer_domain = space - layer_domain
         return layer_domain
 
-def ncbf_generator(activators, inhibitors, space, all_nodes):
+def ncbf_structures(activators, inhibitors, all_nodes, max_layers=None, max_layer_size=None):
     """
     DESCRIPTION:
-    A function to generate all the NCBF, and handle the algorithm selection 
-    and the situation of the contradictory nodes.
+    A function to generate the layer structure of all the NCBF, and handle 
+    the algorithm selection and the situation of the contradictory nodes.
+    No domain is computed, so it is also a cheap way to count the NCBFs.
     :param activators: [list] activator pathways targeting the selected node.
     :param inhibitors: [list] inhibitor pathways targeting the selected node.
-    :param space: [set] all the possible terms with the number nodes studied.
     :param all_nodes: [set] all the variables used to denote nodes.
-    :return: [list] the domain (set) of every NCBF.
+    :param max_layers: [int] maximum number of layers of the NCBFs.
+    :param max_layer_size: [int] maximum number of nodes per layer.
+    :return: [tuple] the layer structure (list) of every NCBF and the info
+    (domain and activator flag) of every variable used in the layers.
     """
     # Detect contradictory nodes
     activator_nodes = set(pathway['antecedent'] for pathway in activators)
@@ -120,7 +140,7 @@ def ncbf_generator(activators, inhibitors, space, all_nodes):
         # Any modified inhibitor will show a numeric antecedent
         id_modified = 0
         modified_nodes = set()
-        for node in contradictory_nodes:
+        for node in sorted(contradictory_nodes):
             id_modified += 1
             original_pathway = list(filter(lambda pathway: pathway['antecedent'] == node, contradictory_inhibitors))[0]
             modified_pathway = {
@@ -149,7 +169,7 @@ def ncbf_generator(activators, inhibitors, space, all_nodes):
         else:
             repeated_activators.append(activators[i])
     for repeated in repeated_activators:
-        new_symbol = choice(list(available_variables))
+        new_symbol = min(available_variables)
         available_variables = available_variables - set(new_symbol)
         # Store previous value
         repeated_pathways.append({'pathway': repeated, 'old': repeated['antecedent'], 'new': new_symbol})
@@ -165,7 +185,7 @@ def ncbf_generator(activators, inhibitors, space, all_nodes):
         else:
             repeated_inhibitors.append(inhibitors[i])
     for repeated in repeated_inhibitors:
-        new_symbol = choice(list(available_variables))
+        new_symbol = min(available_variables)
         available_variables = available_variables - set(new_symbol)
         # Store previous value
         repeated_pathways.append({'pathway': repeated, 'old': repeated['antecedent'], 'new': new_symbol})
@@ -173,23 +193,83 @@ def ncbf_generator(activators, inhibitors, space, all_nodes):
         repeated['antecedent'] = new_symbol
         inhibitor_nodes = inhibitor_nodes | set(new_symbol)
     # Execute the inference algorithm
-    activator_possibilities = [itertools.combinations(activator_nodes, i + 1)
+    # NOTE: the nodes are sorted so that the order of the NCBFs is the same in
+    # every process, regardless of the hash seed.
+    activator_possibilities = [itertools.combinations(sorted(activator_nodes), i + 1)
         for i in range(len(activator_nodes))]
     activator_possibilities = [''.join(sorted(it)) for sb in activator_possibilities for it in sb]
-    inhibitor_possibilities = [itertools.combinations(inhibitor_nodes, i + 1) 
+    inhibitor_possibilities = [itertools.combinations(sorted(inhibitor_nodes), i + 1) 
         for i in range(len(inhibitor_nodes))]
     inhibitor_possibilities = [''.join(sorted(it)) for sb in inhibitor_possibilities for it in sb]
+    if max_layer_size is not None:
+        activator_possibilities = [layer for layer in activator_possibilities if len(layer) <= max_layer_size]
+        inhibitor_possibilities = [layer for layer in inhibitor_possibilities if len(layer) <= max_layer_size]
     n_elements = len(list(activator_nodes | inhibitor_nodes))
-    ncbfs_1 = ncbf_recursive(activator_possibilities, inhibitor_possibilities, n_elements)
-    ncbfs_2 = ncbf_recursive(inhibitor_possibilities, activator_possibilities, n_elements)
+    ncbfs_1 = ncbf_recursive(activator_possibilities, inhibitor_possibilities, n_elements, max_layers=max_layers)
+    ncbfs_2 = ncbf_recursive(inhibitor_possibilities, activator_possibilities, n_elements, max_layers=max_layers)
     ncbfs = ncbfs_1 if not activator_nodes or not inhibitor_nodes else ncbfs_1 + ncbfs_2
     # Create relationship between antecedent and pathway
     antecedent_info = {pathway['antecedent']: (pathway['domain'], pathway['activator'])
         for pathway in activators + inhibitors}
-    # Obtain the domain of every NCBF and return
-    domains = [ncbf_obtain_domain(ncbf, antecedent_info, space, first=True) for ncbf in ncbfs]
     # Correct the substitution of variables in repeated/redundant pathways
     if repeated_pathways:
         for repeated_pathway in repeated_pathways:
             repeated_pathway['pathway']['antecedent'] = repeated_pathway['old']
-    return domains
\ No newline at end of file
+    return ncbfs, antecedent_info
+
+def ncbf_count(n_activators, n_inhibitors, max_layers=None, max_layer_size=None):
+    """
+    DESCRIPTION:
+    A function to count the NCBFs that ncbf_structures would build without
+    building them. Every NCBF is a sequence of layers of alternating type
+    that gathers all the activators and inhibitors, so the count is 
+    obtained by recursion on the number of nodes left of every type.
+    :param n_activators: [int] number of activator variables of the node.
+    :param n_inhibitors: [int] number of inhibitor variables of the node.
+    :param max_layers: [int] maximum number of layers of the NCBFs.
+    :param max_layer_size: [int] maximum number of nodes per layer.
+    :return: [int] the number of NCBFs.
+    """
+    # Helper functions
+    @lru_cache(maxsize=None)
+    def remaining(n_current, n_other, n_layers):
+        """
+        DESCRIPTION:
+        Helper function to count the ways to complete a NCBF when the next 
+        layer is of the current type.
+        :param n_current: [int] nodes left of the type of the next layer.
+        :param n_other: [int] nodes left of the other type.
+        :param n_layers: [int] number of layers already placed.
+        :return: [int] the number of completions.
+        """
+        if not n_current:
+            return int(not n_other)
+        if max_layers is not None and n_layers >= max_layers:
+            return 0
+        max_size = n_current if max_layer_size is None else min(n_current, max_layer_size)
+        return sum(comb(n_current, size) * remaining(n_other, n_current - size, n_layers + 1)
+            for size in range(1, max_size + 1))
+
+    if n_activators and n_inhibitors:
+        return remaining(n_activators, n_inhibitors, 0) + remaining(n_inhibitors, n_activators, 0)
+    return remaining(n_activators + n_inhibitors, 0, 0)
+
+def ncbf_generator(activators, inhibitors, space, all_nodes, order=None, max_layers=None, max_layer_size=None):
+    """
+    DESCRIPTION:
+    A function to generate all the NCBF of a node.
+    :param activators: [list] activator pathways targeting the selected node.
+    :param inhibitors: [list] inhibitor pathways targeting the selected node.
+    :param space: [set] all the possible terms with the number nodes studied.
+    :param all_nodes: [set] all the variables used to denote nodes.
+    :param order: [str] key of ncbf_orders to sort the NCBFs by their layer
+    structure. None keeps the order of the enumeration.
+    :param max_layers: [int] maximum number of layers of the NCBFs.
+    :param max_layer_size: [int] maximum number of nodes per layer.
+    :return: [list] the domain (set) of every NCBF.
+    """
+    ncbfs, antecedent_info = ncbf_structures(activators, inhibitors, all_nodes, max_layers, max_layer_size)
+    if order is not None:
+        ncbfs = sorted(ncbfs, key=ncbf_orders[order])
+    # Obtain the domain of every NCBF and return
+    return [ncbf_obtain_domain(ncbf, antecedent_info, space, first=True) for ncbf in ncbfs]
\ No newline at end of file